@@ -1,13 +1,33 @@
-import json
+import inspect
 
 from snowflake.snowpark import Session
-import snowflake.snowpark.functions as F
 from snowflake.ml.feature_store import FeatureView, Entity
 
-from useful_fns import formatSQL, create_FeatureStore, init_snowflake
+from bootstrap_fns import (
+    bootstrap_entities,
+    bootstrap_feature_views,
+    bootstrap_stores,
+    feature_view_versions,
+)
+from materialization_fns import (
+    VIEW,
+    feature_view_kwargs,
+    measure_materialization,
+    measurement_query_tag,
+    needs_rematerialization,
+    print_materialization,
+)
+from registry_fns import next_version_name
+from useful_fns import formatSQL, init_snowflake
 from feature_engineering_fns import uc01_load_data, uc01_pre_process
 
 
+# FeatureView refresh_mode is not accepted by every snowflake-ml-python release (e.g. 1.5.1 uses AUTO)
+FV_SUPPORTS_REFRESH_MODE = (
+    "refresh_mode" in inspect.signature(FeatureView.__init__).parameters
+)
+
+
 def get_dataframes(session, tpcxai_database, tpcxai_schema):
     # Tables
     customer_tbl = ".".join([tpcxai_database, tpcxai_schema, "CUSTOMER"])
@@ -32,17 +52,16 @@ def get_dataframes(session, tpcxai_database, tpcxai_schema):
 
 
 def create_customer_entity(fs):
-    if "CUSTOMER" not in json.loads(
-        fs.list_entities().select(F.to_json(F.array_agg("NAME", True))).collect()[0][0]
-    ):
-        customer_entity = Entity(
-            name="CUSTOMER",
-            join_keys=["O_CUSTOMER_SK"],
-            desc="Primary Key for CUSTOMER",
-        )
-        fs.register_entity(customer_entity)
-    else:
-        customer_entity = fs.get_entity("CUSTOMER")
+    customer_entity = bootstrap_entities(
+        fs,
+        [
+            Entity(
+                name="CUSTOMER",
+                join_keys=["O_CUSTOMER_SK"],
+                desc="Primary Key for CUSTOMER",
+            )
+        ],
+    )["CUSTOMER"]
 
     print(fs.list_entities().show())
 
@@ -66,7 +85,9 @@ def preprocess_data(order_sdf, line_item_sdf, order_returns_sdf):
     return [preprocessed_data, ppd_sql]
 
 
-def create_feature_view(fs, customer_entity, ppd_sql):
+def create_feature_view(
+    fs, customer_entity, ppd_sql, ppd_fv_version="V_1", materialization=None
+):
     # Define descriptions for the FeatureView's Features.  These will be added as comments to the database object
     preprocess_features_desc = {
         "FREQUENCY": "Average yearly order frequency",
@@ -74,36 +95,31 @@ def create_feature_view(fs, customer_entity, ppd_sql):
     }
 
     ppd_fv_name = "FV_UC01_PREPROCESS"
-    ppd_fv_version = "V_1"
 
-    try:
-        # If FeatureView already exists just return the reference to it
-        fv_uc01_preprocess = fs.get_feature_view(
-            name=ppd_fv_name, version=ppd_fv_version
-        )
-    except:
-        # Create the FeatureView instance
-        fv_uc01_preprocess_instance = FeatureView(
-            name=ppd_fv_name,
-            entities=[customer_entity],
-            # feature_df=preprocessed_data,      # <- We can use the snowpark dataframe as-is from our Python
-            feature_df=session.sql(
-                ppd_sql
-            ),  # <- Or we can use SQL, in this case linted from the dataframe generated SQL to make more human readable
-            timestamp_col="LATEST_ORDER_DATE",
-            # refresh_freq="60 minute",  # <- specifying optional refresh_freq creates FeatureView as Dynamic Table, else created as View.
-            desc="Features to support Use Case 01",
-        ).attach_feature_desc(preprocess_features_desc)
-
-        # Register the FeatureView instance.  Creates  object in Snowflake
-        fv_uc01_preprocess = fs.register_feature_view(
-            feature_view=fv_uc01_preprocess_instance, version=ppd_fv_version, block=True
-        )
-        print(f"Feature View : {ppd_fv_name}_{ppd_fv_version} created")
-    else:
-        print(f"Feature View : {ppd_fv_name}_{ppd_fv_version} already created")
-    finally:
-        fs.list_feature_views().show(20)
+    # Materialization policy : View (default), Dynamic Table with a refresh lag, or incrementally refreshed Dynamic Table
+    if materialization is None:
+        materialization = {"MODE": VIEW}
+    fv_kwargs = feature_view_kwargs(materialization, FV_SUPPORTS_REFRESH_MODE)
+
+    # Create the FeatureView instance.  Only registered (creating the object in Snowflake) if it does not already exist
+    fv_uc01_preprocess_instance = FeatureView(
+        name=ppd_fv_name,
+        entities=[customer_entity],
+        # feature_df=preprocessed_data,      # <- We can use the snowpark dataframe as-is from our Python
+        feature_df=session.sql(
+            ppd_sql
+        ),  # <- Or we can use SQL, in this case linted from the dataframe generated SQL to make more human readable
+        timestamp_col="LATEST_ORDER_DATE",
+        # refresh_freq="60 minute",  # <- specifying optional refresh_freq creates FeatureView as Dynamic Table, else created as View.
+        desc="Features to support Use Case 01",
+        **fv_kwargs,
+    ).attach_feature_desc(preprocess_features_desc)
+
+    fv_uc01_preprocess = bootstrap_feature_views(
+        fs, [(fv_uc01_preprocess_instance, ppd_fv_version)]
+    )[(ppd_fv_name, ppd_fv_version)]
+
+    fs.list_feature_views().show(20)
 
     return fv_uc01_preprocess
 
@@ -130,12 +146,13 @@ if __name__ == "__main__":
         scale_factor, tpcxai_database, tpcxai_training_schema, fs_qs_role
     )
 
-    # Get Feature Store
-    fs = create_FeatureStore(
+    # Get Feature Store.  The Model Registry is bootstrapped alongside it for 04_train
+    fs, _ = bootstrap_stores(
         session,
         tpcxai_database,
-        f"""_{tpcxai_training_schema}_FEATURE_STORE""",
         warehouse_env,
+        f"""_{tpcxai_training_schema}_FEATURE_STORE""",
+        "_MODEL_REGISTRY",
     )
 
     # Get Dataframes
@@ -151,8 +168,39 @@ if __name__ == "__main__":
         order_sdf, line_item_sdf, order_returns_sdf
     )
 
-    # Create Feature View
-    fv_uc01_preprocess = create_feature_view(fs, customer_entity, ppd_sql)
+    # Create the first Feature View version, or reference the latest registered version
+    ppd_fv_name = "FV_UC01_PREPROCESS"
+    ppd_fv_versions = feature_view_versions(fs, ppd_fv_name)
+    fv_uc01_preprocess = create_feature_view(
+        fs,
+        customer_entity,
+        ppd_sql,
+        ppd_fv_version=ppd_fv_versions[-1] if ppd_fv_versions else "V_1",
+    )
+
+    with measurement_query_tag(session):
+        print(fv_uc01_preprocess.feature_df.show())
+
+    # Measure the read/write ratio and read latencies, and choose the materialization.
+    # If it differs from the latest registered version, register it as the next Feature View version.
+    ppd_fv_materialization = measure_materialization(
+        session,
+        fs,
+        fv_uc01_preprocess,
+        tpcxai_database,
+        tpcxai_training_schema,
+        ["ORDERS", "LINEITEM", "ORDER_RETURNS"],
+    )
+    print_materialization(ppd_fv_name, ppd_fv_materialization)
 
-    print(fv_uc01_preprocess.feature_df.show())
+    if needs_rematerialization(
+        fv_uc01_preprocess, ppd_fv_materialization, FV_SUPPORTS_REFRESH_MODE
+    ):
+        fv_uc01_preprocess = create_feature_view(
+            fs,
+            customer_entity,
+            ppd_sql,
+            ppd_fv_version=next_version_name(feature_view_versions(fs, ppd_fv_name)),
+            materialization=ppd_fv_materialization,
+        )
     print("Feature engineering succesfully completed !")
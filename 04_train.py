@@ -3,12 +3,10 @@ from snowflake.ml.modeling.pipeline import Pipeline as sml_Pipeline
 from snowflake.ml.modeling.preprocessing import MinMaxScaler as sml_MinMaxScaler
 from snowflake.ml.modeling.cluster import KMeans as sml_KMeans
 
-from useful_fns import (
-    init_snowflake,
-    check_and_update,
-    create_ModelRegistry,
-    create_FeatureStore,
-)
+from bootstrap_fns import bootstrap_stores, feature_view_versions
+from model_selection_fns import check_refit_inertia, uc01_sweep
+from registry_fns import RegistryIndex
+from useful_fns import init_snowflake
 
 
 def create_spine(fv_uc01_preprocess):
@@ -46,7 +44,7 @@ def generate_dataset(fs, spine_sdf, fv_uc01_preprocess):
 ## MODEL PIPELINE
 ## - Model Specific Transforms
 ## - Model Fitting Function (Kmeans)
-def uc01_train(featurevector, num_clusters):
+def uc01_train(featurevector, num_clusters, random_state=0, n_init=10):
     mms_input_cols = ["RETURN_RATIO", "FREQUENCY"]
     km_input_cols = mms_output_cols = ["RETURN_RATIO_MMS", "FREQUENCY_MMS"]
     km_output_cols = "CLUSTER"
@@ -66,8 +64,8 @@ def uc01_train(featurevector, num_clusters):
                     n_clusters=num_clusters,
                     init="k-means++",
                     max_iter=300,
-                    n_init=10,
-                    random_state=0,
+                    n_init=n_init,
+                    random_state=random_state,
                     input_cols=km_input_cols,
                     output_cols=km_output_cols,
                 ),
@@ -97,25 +95,23 @@ if __name__ == "__main__":
 
     # Feature view
     ppd_fv_name = "FV_UC01_PREPROCESS"
-    ppd_fv_version = "V_1"
 
     # Init Snowflake
     session, warehouse_env = init_snowflake(
         scale_factor, tpcxai_database, tpcxai_training_schema, fs_qs_role
     )
 
-    # Create/Reference Snowflake Model Registry - Common across Environments
-    mr = create_ModelRegistry(session, tpcxai_database, "_MODEL_REGISTRY")
-
-    # Get Feature Store
-    fs = create_FeatureStore(
+    # Create/Reference Snowflake Model Registry - Common across Environments, and Feature Store
+    fs, mr = bootstrap_stores(
         session,
         tpcxai_database,
-        f"""_{tpcxai_training_schema}_FEATURE_STORE""",
         warehouse_env,
+        f"""_{tpcxai_training_schema}_FEATURE_STORE""",
+        "_MODEL_REGISTRY",
     )
 
-    # Retrieve a Feature View instance for use within Python
+    # Retrieve the latest Feature View version, i.e. the one registered under the current materialization policy
+    ppd_fv_version = feature_view_versions(fs, ppd_fv_name)[-1]
     fv_uc01_preprocess = fs.get_feature_view(ppd_fv_name, ppd_fv_version)
 
     # Create Spine
@@ -128,11 +124,30 @@ if __name__ == "__main__":
     model_name = "UC01_SNOWFLAKEML_KMEANS_MODEL"
     num_clusters = 5
 
-    train_result = uc01_train(training_dataset_sdf, num_clusters)
+    # Sweep mode : evaluate a grid of cluster-counts and seeds in parallel, and fit only the winner
+    sweep_mode = False
+    sweep_cluster_grid = range(3, 9)
+    sweep_seeds = range(10)
+
+    if sweep_mode:
+        best_candidate, _ = uc01_sweep(
+            training_dataset_sdf, sweep_cluster_grid, sweep_seeds
+        )
+        # Refit the winning cluster-count with as many restarts as seeds were swept,
+        # on the same row order, and check it matches the scored candidate
+        train_result = uc01_train(
+            training_dataset_sdf.sort("O_CUSTOMER_SK"),
+            best_candidate["NUM_CLUSTERS"],
+            random_state=best_candidate["RANDOM_STATE"],
+            n_init=len(sweep_seeds),
+        )
+        check_refit_inertia(train_result["MODEL"], best_candidate)
+    else:
+        train_result = uc01_train(training_dataset_sdf, num_clusters)
 
     # Check for the latest version of this model in registry, and increment version
-    mr_df = mr.show_models()
-    model_version = check_and_update(mr_df, model_name)
+    registry_index = RegistryIndex(mr)
+    model_version = registry_index.next_version(model_name)
     print("model version:\t", model_version)
     # Save the Model to the Model Registry
     mv_kmeans = mr.log_model(
@@ -142,12 +157,11 @@ if __name__ == "__main__":
         comment="TPCXAI USE CASE 01 - KMEANS - CUSTOMER PURCHASE CLUSTERS",
     )
 
-    print(mr.show_models())
-
-    # Get and set default for latest version of the model
-    m = mr.get_model(model_name)
-    latest_version = m.show_versions().iloc[-1]["name"]
-    mv = m.version(latest_version)
-    m.default = latest_version
+    # Registry round-trips per job : the cached show_models listing, the log_model write and,
+    # for all but a model's first version, one ALTER MODEL setting the new default - three at most.
+    registry_index.set_default_version(
+        session, tpcxai_database, "_MODEL_REGISTRY", model_name, model_version
+    )
+    print(f"{model_name} versions :", registry_index.versions(model_name))
 
     print("Model training succesfully completed !")
@@ -0,0 +1,392 @@
+# ------------------------------------------------------------------------------
+# Hands-On Lab: Advanced Guide to Snowflake Feature Store - Incremental Ingest Simulator
+# Script:       05_ingest_simulator.py
+# Description: This Python script replays the scheduled incremental ingest locally, faster than real time,
+#              and drives the feature refresh -> scoring loop to measure freshness lag, refresh latency and
+#              throughput as the ingest rate rises.
+# ------------------------------------------------------------------------------
+
+import random
+import statistics
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pandas as pd
+from snowflake.snowpark import Session
+from snowflake.snowpark.mock import ColumnEmulator, ColumnType, patch
+import snowflake.snowpark.functions as F
+import snowflake.snowpark.types as T
+
+
+
+# Ingest rates to ramp through, in orders per simulated second.
+# The local backend emulates joins in pandas and slows sharply with table size, so rates and the
+# baseline are kept small; its latencies show how the loop scales, not production timings.
+INGEST_RATES = [0.05, 0.1, 0.25, 0.5, 1]
+# Simulated seconds covered by each ingest tick (the scheduled task cadence)
+TICK_SECONDS = 60
+# Simulated seconds that elapse per wall-clock second
+SPEEDUP = 6
+# Ticks replayed per ingest rate
+TICKS_PER_RATE = 3
+# Orders pre-loaded before each rate step, spread over the preceding BASELINE_DAYS, so every rate
+# starts from the same table size rather than the history built up by earlier steps
+BASELINE_ORDERS = 25
+BASELINE_DAYS = 30
+# Synthetic population
+NUM_CUSTOMERS = 1000
+NUM_PRODUCTS = 500
+MAX_LINEITEMS_PER_ORDER = 5
+RETURN_RATE = 0.3
+# Fixed scaled-feature centroids (RETURN_RATIO, FREQUENCY) standing in for the registered KMeans model
+CENTROIDS = [(0.1, 0.1), (0.1, 0.6), (0.5, 0.3), (0.9, 0.2), (0.5, 0.9)]
+
+ORDERS_SCHEMA = T.StructType(
+    [
+        T.StructField("O_ORDER_ID", T.LongType()),
+        T.StructField("O_CUSTOMER_SK", T.LongType()),
+        T.StructField("ORDER_TS", T.TimestampType()),
+        T.StructField("WEEKDAY", T.StringType()),
+        T.StructField("ORDER_DATE", T.DateType()),
+        T.StructField("STORE", T.LongType()),
+        T.StructField("TRIP_TYPE", T.LongType()),
+    ]
+)
+LINEITEM_SCHEMA = T.StructType(
+    [
+        T.StructField("LI_ORDER_ID", T.LongType()),
+        T.StructField("LI_PRODUCT_ID", T.LongType()),
+        T.StructField("QUANTITY", T.LongType()),
+        T.StructField("PRICE", T.DecimalType(8, 2)),
+    ]
+)
+ORDER_RETURNS_SCHEMA = T.StructType(
+    [
+        T.StructField("OR_ORDER_ID", T.LongType()),
+        T.StructField("OR_PRODUCT_ID", T.LongType()),
+        T.StructField("OR_RETURN_QUANTITY", T.LongType()),
+    ]
+)
+
+
+@patch(F.year)
+def _mock_year(column: ColumnEmulator) -> ColumnEmulator:
+    """
+    Local testing implementation of YEAR, which the local backend does not provide.
+    """
+    return ColumnEmulator(
+        data=[None if pd.isna(d) else d.year for d in column],
+        sf_type=ColumnType(T.LongType(), column.sf_type.nullable),
+    )
+
+
+def create_local_session():
+    """
+    Create a Snowpark session against the local testing backend, so no Snowflake account is needed.
+    """
+    return Session.builder.config("local_testing", True).create()
+
+
+def generate_batch(rng, first_order_id, num_orders, batch_end_ts, tick_seconds):
+    """
+    Generate one ingest batch of synthetic orders, line-items and returns.
+    As in 02_load_raw, ORDER_TS is spread uniformly across the interval preceding the batch timestamp.
+    rng            : random.Random instance
+    first_order_id : Order id of the first order in the batch
+    num_orders     : Number of orders in the batch
+    batch_end_ts   : Simulated timestamp at which the batch is ingested
+    tick_seconds   : Simulated seconds covered by the batch
+
+    Returns        : [orders rows, lineitem rows, order_returns rows]
+    """
+    orders, lineitems, order_returns = [], [], []
+    for order_id in range(first_order_id, first_order_id + num_orders):
+        order_ts = batch_end_ts - timedelta(seconds=rng.uniform(0, tick_seconds))
+        orders.append(
+            [
+                order_id,
+                rng.randint(1, NUM_CUSTOMERS),
+                order_ts,
+                order_ts.strftime("%A"),
+                order_ts.date(),
+                rng.randint(1, 50),
+                rng.randint(1, 40),
+            ]
+        )
+        for product_id in rng.sample(
+            range(1, NUM_PRODUCTS + 1), rng.randint(1, MAX_LINEITEMS_PER_ORDER)
+        ):
+            quantity = rng.randint(1, 5)
+            price = Decimal(f"{rng.uniform(1, 200):.2f}")
+            lineitems.append([order_id, product_id, quantity, price])
+            if rng.random() < RETURN_RATE:
+                order_returns.append([order_id, product_id, rng.randint(0, quantity)])
+    return [orders, lineitems, order_returns]
+
+
+def ingest_batch(session, batch, mode="append"):
+    """
+    Write an ingest batch to the local ORDERS, LINEITEM and ORDER_RETURNS tables.
+    session : Snowpark session
+    batch   : [orders rows, lineitem rows, order_returns rows] from generate_batch
+    mode    : Save mode.  "append" for incremental ingest, "overwrite" to reset the tables
+    """
+    for rows, schema, tname in zip(
+        batch,
+        [ORDERS_SCHEMA, LINEITEM_SCHEMA, ORDER_RETURNS_SCHEMA],
+        ["ORDERS", "LINEITEM", "ORDER_RETURNS"],
+    ):
+        if rows or mode == "overwrite":
+            session.create_dataframe(rows, schema=schema).write.save_as_table(
+                tname, mode=mode
+            )
+
+
+def reset_tables(session, rng, sim_clock):
+    """
+    Reset the source tables to a fixed baseline of BASELINE_ORDERS orders ending at sim_clock.
+    session   : Snowpark session
+    rng       : random.Random instance
+    sim_clock : Simulated timestamp the baseline ends at
+
+    Returns   : Next order id to generate
+    """
+    ingest_batch(
+        session,
+        generate_batch(rng, 1, BASELINE_ORDERS, sim_clock, BASELINE_DAYS * 86400),
+        mode="overwrite",
+    )
+    return BASELINE_ORDERS + 1
+
+
+def uc01_load_data_local(order_data, lineitem_data, order_returns_data):
+    """
+    Local-backend equivalent of uc01_load_data.
+    The local backend's fillna misaligns rows after a join, so Null defaults are applied with coalesce instead,
+    and PRICE is cast to DoubleType because it cannot divide the Decimal price totals in uc01_pre_process_local.
+    order_data         : A dataframe referencing the local ORDERS table
+    lineitem_data      : A dataframe referencing the local LINEITEM table
+    order_returns_data : A dataframe referencing the local ORDER_RETURNS table
+
+    Returns            : Merged/cleansed dataframe with the same columns as uc01_load_data
+    """
+    raw_data = lineitem_data.join(
+        order_returns_data,
+        (lineitem_data["LI_ORDER_ID"] == order_returns_data["OR_ORDER_ID"])
+        & (lineitem_data["LI_PRODUCT_ID"] == order_returns_data["OR_PRODUCT_ID"]),
+        "left",
+    ).join(
+        order_data,
+        order_returns_data["OR_ORDER_ID"] == order_data["O_ORDER_ID"],
+        "inner",
+    )
+    defaults = {
+        "O_ORDER_ID": 0,
+        "O_CUSTOMER_SK": 0,
+        "ORDER_DATE": date(year=1970, month=1, day=1),
+        "LI_PRODUCT_ID": None,
+        "PRICE": 0.0,
+        "QUANTITY": 0,
+        "OR_RETURN_QUANTITY": 0,
+    }
+    raw_data = raw_data.with_column("PRICE", raw_data["PRICE"].cast(T.DoubleType()))
+    return raw_data.select(
+        [
+            raw_data[c]
+            if default is None
+            else F.coalesce(raw_data[c], F.lit(default)).alias(c)
+            for c, default in defaults.items()
+        ]
+    )
+
+
+def uc01_pre_process_local(data):
+    """
+    Local-backend equivalent of uc01_pre_process, producing the same customer level features.
+    The local backend cannot cast inside an aggregate, nor to FloatType, so the aggregated
+    features are cast to DoubleType afterwards.
+    data    : Dataframe returned by uc01_load_data_local
+
+    Returns : Customer level behavioural features
+    """
+    data = data.with_columns(
+        ["INVOICE_YEAR", "ROW_PRICE", "RETURN_ROW_PRICE"],
+        [
+            F.year(data["ORDER_DATE"]),
+            data["QUANTITY"] * data["PRICE"],
+            data["OR_RETURN_QUANTITY"] * data["PRICE"],
+        ],
+    )
+
+    groups = data.group_by("O_CUSTOMER_SK", "O_ORDER_ID").agg(
+        F.sum(F.col("ROW_PRICE")).alias("ROW_PRICE"),
+        F.sum(F.col("RETURN_ROW_PRICE")).alias("RETURN_ROW_PRICE"),
+        F.min(F.col("INVOICE_YEAR")).alias("INVOICE_YEAR"),
+        F.max(F.col("ORDER_DATE")).alias("LATEST_ORDER_DATE"),
+    )
+    groups = groups.with_column(
+        "RATIO", groups["RETURN_ROW_PRICE"] / groups["ROW_PRICE"]
+    )
+    ratio = groups.group_by("O_CUSTOMER_SK").agg(
+        F.avg(F.col("RATIO")).alias("RETURN_RATIO"),
+        F.max(F.col("LATEST_ORDER_DATE")).alias("LATEST_ORDER_DATE"),
+    )
+    ratio = ratio.with_column("RETURN_RATIO", ratio["RETURN_RATIO"].cast(T.DoubleType()))
+
+    frequency_groups = groups.group_by("O_CUSTOMER_SK", "INVOICE_YEAR").agg(
+        F.count(F.col("O_ORDER_ID")).alias("FREQUENCY")
+    )
+    frequency = frequency_groups.group_by("O_CUSTOMER_SK").agg(
+        F.avg(F.col("FREQUENCY")).alias("FREQUENCY")
+    )
+    frequency = frequency.with_column(
+        "FREQUENCY", frequency["FREQUENCY"].cast(T.DoubleType())
+    )
+
+    return frequency.join(ratio, on="O_CUSTOMER_SK")
+
+
+def refresh_features(session):
+    """
+    Recompute the UC01 customer features from the ingested tables and materialize them.
+    session : Snowpark session
+
+    Returns : Refresh latency in seconds
+    """
+    start = time.perf_counter()
+    features = uc01_pre_process_local(
+        uc01_load_data_local(
+            session.table("ORDERS"),
+            session.table("LINEITEM"),
+            session.table("ORDER_RETURNS"),
+        ).cache_result()
+    )
+    features.write.save_as_table("FV_UC01_PREPROCESS", mode="overwrite")
+    return time.perf_counter() - start
+
+
+def score_features(session):
+    """
+    Assign each customer to its nearest segment centroid using min-max scaled features.
+    session : Snowpark session
+
+    Returns : [scoring latency in seconds, number of customers scored]
+    """
+    start = time.perf_counter()
+    rows = session.table("FV_UC01_PREPROCESS").collect()
+    segments = []
+    if rows:
+        cols = ["RETURN_RATIO", "FREQUENCY"]
+        values = [[float(row[c] or 0.0) for c in cols] for row in rows]
+        mins = [min(v[i] for v in values) for i in range(len(cols))]
+        ranges = [(max(v[i] for v in values) - mins[i]) or 1.0 for i in range(len(cols))]
+        for v in values:
+            scaled = [(v[i] - mins[i]) / ranges[i] for i in range(len(cols))]
+            segments.append(
+                min(
+                    range(len(CENTROIDS)),
+                    key=lambda c: sum((s - m) ** 2 for s, m in zip(scaled, CENTROIDS[c])),
+                )
+            )
+    return [time.perf_counter() - start, len(segments)]
+
+
+def simulate_rate(session, rng, rate, sim_clock, ticks=TICKS_PER_RATE):
+    """
+    Reset the source tables to the baseline, then replay ingest at a fixed rate,
+    running the feature refresh -> scoring loop after every tick.
+    Each tick has a wall-clock budget of TICK_SECONDS / SPEEDUP; when ingest, refresh and scoring
+    overrun it, the loop no longer keeps up and freshness lag grows tick over tick.
+    Freshness lag is the simulated time from a batch being due to land until its scores are available,
+    including any backlog carried over from earlier ticks.
+    session   : Snowpark session
+    rng       : random.Random instance
+    rate      : Orders per simulated second
+    sim_clock : Simulated timestamp at the start of the run
+    ticks     : Number of ticks to replay
+
+    Returns   : [metrics dict, simulated clock after the run]
+    """
+    first_order_id = reset_tables(session, rng, sim_clock)
+    tick_budget = TICK_SECONDS / SPEEDUP
+    refresh_latencies, scoring_latencies, freshness_lags = [], [], []
+    orders_ingested, wall_start, behind = 0, time.perf_counter(), 0.0
+
+    for _ in range(ticks):
+        tick_start = time.perf_counter()
+        sim_clock += timedelta(seconds=TICK_SECONDS)
+        num_orders = int(rate * TICK_SECONDS) + (
+            1 if rng.random() < (rate * TICK_SECONDS) % 1 else 0
+        )
+
+        ingest_batch(
+            session,
+            generate_batch(rng, first_order_id, num_orders, sim_clock, TICK_SECONDS),
+        )
+        first_order_id += num_orders
+        orders_ingested += num_orders
+
+        refresh_latencies.append(refresh_features(session))
+        scoring_latencies.append(score_features(session)[0])
+
+        elapsed = time.perf_counter() - tick_start
+        freshness_lags.append((behind + elapsed) * SPEEDUP)
+        behind = max(behind + elapsed - tick_budget, 0.0)
+        if behind == 0.0:
+            time.sleep(max(tick_budget - elapsed, 0.0))
+
+    wall_seconds = time.perf_counter() - wall_start
+    metrics = {
+        "RATE": rate,
+        "ORDERS_INGESTED": orders_ingested,
+        "ORDERS_TABLE_ROWS": session.table("ORDERS").count(),
+        "REFRESH_P50_S": statistics.median(refresh_latencies),
+        "REFRESH_MAX_S": max(refresh_latencies),
+        "SCORING_P50_S": statistics.median(scoring_latencies),
+        "FRESHNESS_LAG_P50_S": statistics.median(freshness_lags),
+        "FRESHNESS_LAG_MAX_S": max(freshness_lags),
+        "THROUGHPUT_ORDERS_PER_WALL_S": orders_ingested / wall_seconds,
+        "KEEPS_UP": behind == 0.0,
+    }
+    return [metrics, sim_clock]
+
+
+def run_simulation(session, rates=INGEST_RATES, ticks=TICKS_PER_RATE, seed=0):
+    """
+    Ramp through the ingest rates until the pipeline no longer keeps up, and report metrics per rate.
+    session : Snowpark session
+    rates   : Ingest rates to ramp through, in orders per simulated second
+    ticks   : Number of ticks to replay per rate
+    seed    : Random seed for the synthetic data
+
+    Returns : List of metrics dicts, one per rate simulated
+    """
+    rng = random.Random(seed)
+    sim_clock = datetime.now().replace(microsecond=0)
+    results = []
+
+    print(
+        f"Simulating {TICK_SECONDS} sim-s ingest ticks from a {BASELINE_ORDERS} order baseline at {SPEEDUP}x real time ({TICK_SECONDS / SPEEDUP:.2f}s wall budget per tick)\n"
+    )
+    for rate in rates:
+        metrics, sim_clock = simulate_rate(session, rng, rate, sim_clock, ticks)
+        results.append(metrics)
+        print(
+            f"Rate {rate:>6} orders/sim-s ({metrics['ORDERS_TABLE_ROWS']} ORDERS rows at end) : "
+            f"refresh p50 {metrics['REFRESH_P50_S']:.3f}s max {metrics['REFRESH_MAX_S']:.3f}s | "
+            f"scoring p50 {metrics['SCORING_P50_S']:.3f}s | "
+            f"freshness lag p50 {metrics['FRESHNESS_LAG_P50_S']:.0f} sim-s max {metrics['FRESHNESS_LAG_MAX_S']:.0f} sim-s | "
+            f"throughput {metrics['THROUGHPUT_ORDERS_PER_WALL_S']:.1f} orders/wall-s | "
+            f"{'keeps up' if metrics['KEEPS_UP'] else 'FALLS BEHIND'}"
+        )
+        if not metrics["KEEPS_UP"]:
+            print(f"\nPipeline falls behind at {rate} orders per simulated second")
+            break
+
+    return results
+
+
+if __name__ == "__main__":
+    with create_local_session() as session:
+        run_simulation(session)
@@ -0,0 +1,128 @@
+# ENVIRONMENT BOOTSTRAP FUNCTIONS
+
+from snowflake.ml.feature_store import FeatureStore, CreationMode
+from snowflake.ml.registry import Registry
+
+from registry_fns import parse_versions
+
+
+def existing_schemas(session, database):
+    """
+    Get the names of all schemas in a database with a single metadata query.
+    session  : Snowpark session
+    database : Database to list schemas for
+    """
+    rows = session.sql(f"""show schemas in database {database}""").collect()
+    return {row["name"].upper() for row in rows}
+
+
+def existing_entities(fs):
+    """
+    Get the names of all entities registered in a Feature Store with a single metadata query.
+    fs : Feature Store reference
+    """
+    return {row["NAME"].upper() for row in fs.list_entities().select("NAME").collect()}
+
+
+def existing_feature_views(fs):
+    """
+    Get the (name, version) pairs of all Feature Views in a Feature Store with a single metadata query.
+    fs : Feature Store reference
+    """
+    return {
+        (row["NAME"].upper(), str(row["VERSION"]).upper())
+        for row in fs.list_feature_views().select("NAME", "VERSION").collect()
+    }
+
+
+def feature_view_versions(fs, fv_name):
+    """
+    Get the registered versions of a Feature View in ascending version order, so the last is the latest.
+    fs      : Feature Store reference
+    fv_name : Feature View name to list versions for
+    """
+    return parse_versions(
+        [version for name, version in existing_feature_views(fs) if name == fv_name.upper()]
+    )
+
+
+def bootstrap_stores(session, database, warehouse, fs_schema, mr_schema="_MODEL_REGISTRY"):
+    """
+    Create the Feature Store and Model Registry schemas if missing, and return references.
+    Existing schemas are opened without creation so that genuine failures are not reported as "already exists".
+    Objects are created sequentially: the Snowpark session and the Feature Store's warehouse switching are not thread-safe.
+    session   : Snowpark session
+    database  : Database to use for Feature Store and Model Registry
+    warehouse : Warehouse to use as default for Feature Store
+    fs_schema : Schema name to create/use for Feature Store
+    mr_schema : Schema name to create/use for Model Registry
+
+    Returns   : [Feature Store reference, Model Registry reference]
+    """
+    schemas = existing_schemas(session, database)
+    fs_exists = fs_schema.upper() in schemas
+    mr_exists = mr_schema.upper() in schemas
+    cs = session.get_current_schema()
+
+    try:
+        mode = CreationMode.FAIL_IF_NOT_EXIST if fs_exists else CreationMode.CREATE_IF_NOT_EXIST
+        fs = FeatureStore(session, database, fs_schema, warehouse, mode)
+        if not mr_exists:
+            session.sql(f"""create schema if not exists {database}.{mr_schema}""").collect()
+        mr = Registry(session=session, database_name=database, schema_name=mr_schema)
+    finally:
+        # Schema creation switches the session's current schema, so restore it
+        if cs is not None and not (fs_exists and mr_exists):
+            session.sql(f"""use schema {cs}""").collect()
+
+    print(f"Feature Store ({fs_schema}) {'already exists' if fs_exists else 'created'}")
+    print(f"Model Registry ({mr_schema}) {'already exists' if mr_exists else 'created'}")
+
+    return [fs, mr]
+
+
+def bootstrap_entities(fs, entities):
+    """
+    Register any missing entities and return references to all of them.
+    fs       : Feature Store reference
+    entities : List of Entity instances that should exist
+
+    Returns  : Dict of entity name to registered Entity
+    """
+    existing = existing_entities(fs)
+    result = {}
+    for entity in entities:
+        name = str(entity.name)
+        if name.upper() in existing:
+            result[name] = fs.get_entity(name)
+            print(f"Entity : {name} already created")
+        else:
+            fs.register_entity(entity)
+            result[name] = entity
+            print(f"Entity : {name} created")
+
+    return result
+
+
+def bootstrap_feature_views(fs, feature_views):
+    """
+    Register any missing Feature Views and return references to all of them.
+    fs            : Feature Store reference
+    feature_views : List of (FeatureView instance, version) pairs that should exist
+
+    Returns       : Dict of (name, version) to registered FeatureView
+    """
+    existing = existing_feature_views(fs)
+    result = {}
+    for fv, version in feature_views:
+        name = str(fv.name)
+        if (name.upper(), str(version).upper()) in existing:
+            result[(name, version)] = fs.get_feature_view(name=name, version=version)
+            print(f"Feature View : {name}_{version} already created")
+        else:
+            result[(name, version)] = fs.register_feature_view(
+                feature_view=fv, version=version, block=True
+            )
+            print(f"Feature View : {name}_{version} created")
+
+    return result
@@ -0,0 +1,284 @@
+# FEATURE VIEW MATERIALIZATION FUNCTIONS
+
+import re
+import time
+from contextlib import contextmanager
+
+import snowflake.snowpark.functions as F
+
+
+VIEW = "VIEW"
+DYNAMIC_TABLE = "DYNAMIC_TABLE"
+INCREMENTAL = "INCREMENTAL"
+
+# Query tag set on this module's own reads, so they are not counted as Feature View workload
+MEASUREMENT_QUERY_TAG = "FEATURE_VIEW_MATERIALIZATION_MEASUREMENT"
+
+_LAG_PATTERN = re.compile(
+    r"^\s*(?P<num>\d+)\s*(?P<unit>second|minute|hour|day)s?\s*$", re.IGNORECASE
+)
+_LAG_UNIT_SECONDS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+@contextmanager
+def measurement_query_tag(session):
+    """
+    Tag the queries issued within the block so measure_read_write_rates excludes them.
+    session : Snowpark session
+    """
+    previous_tag = session.query_tag
+    session.query_tag = MEASUREMENT_QUERY_TAG
+    try:
+        yield
+    finally:
+        session.query_tag = previous_tag
+
+
+def scan_all_columns(df):
+    """
+    Read every row and column of a dataframe server-side, without fetching it to the client.
+    A row count can be answered from table metadata, so a hash over all columns is aggregated instead.
+    df      : Snowpark dataframe to scan
+
+    Returns : The aggregated hash, so the scan cannot be skipped
+    """
+    return df.select(F.sum(F.hash(*df.columns))).collect()
+
+
+def _median_scan_seconds(df, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        scan_all_columns(df)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def time_feature_view_read(fs, fv, repeats=3):
+    """
+    Measure the median latency of a full read of a Feature View.
+    fs      : Feature Store reference, or any stand-in exposing read_feature_view(fv)
+    fv      : Feature View to read
+    repeats : Number of timed reads
+
+    Returns : Median read latency in seconds
+    """
+    return _median_scan_seconds(fs.read_feature_view(fv), repeats)
+
+
+def time_materialized_read(fs, fv, repeats=3):
+    """
+    Measure the median latency of reading a Feature View once its result is materialized.
+    fs      : Feature Store reference, or any stand-in exposing read_feature_view(fv)
+    fv      : Feature View to read
+    repeats : Number of timed reads
+
+    Returns : Median read latency in seconds from a materialized snapshot
+    """
+    snapshot = fs.read_feature_view(fv).cache_result()
+    return _median_scan_seconds(snapshot, repeats)
+
+
+def measure_read_write_rates(
+    session, fv_name, database, schema, source_tables, lookback_hours=24
+):
+    """
+    Measure Feature View reads and source-table writes per hour from recent query history.
+    Measurement queries (tagged with MEASUREMENT_QUERY_TAG) and query-history lookups are excluded.
+    session        : Snowpark session
+    fv_name        : Name of the Feature View (matched against query text)
+    database       : Database of the source tables
+    schema         : Schema of the source tables
+    source_tables  : Names of the tables the Feature View aggregates
+    lookback_hours : Hours of query history to consider
+
+    Returns        : [reads per hour, writes per hour]
+    """
+    tables_filter = " or ".join(
+        f"query_text ilike '%{database}.{schema}.{tname}%'" for tname in source_tables
+    )
+    with measurement_query_tag(session):
+        row = session.sql(
+            f"""select
+                    count_if(query_type = 'SELECT' and query_text ilike '%{fv_name}%') reads,
+                    count_if(query_type in ('INSERT', 'MERGE', 'UPDATE', 'DELETE', 'COPY') and ({tables_filter})) writes
+                from table(information_schema.query_history(
+                    end_time_range_start => dateadd('hours', -{lookback_hours}, current_timestamp()),
+                    result_limit => 10000))
+                where execution_status = 'SUCCESS'
+                  and coalesce(query_tag, '') != '{MEASUREMENT_QUERY_TAG}'
+                  and query_text not ilike '%information_schema.query_history%'"""
+        ).collect()[0]
+    return [row["READS"] / lookback_hours, row["WRITES"] / lookback_hours]
+
+
+def choose_materialization(
+    reads_per_hour,
+    writes_per_hour,
+    view_read_seconds,
+    table_read_seconds,
+    min_read_write_ratio=1.0,
+    incremental_writes_per_hour=12,
+    min_lag_minutes=1,
+    max_lag_minutes=1440,
+):
+    """
+    Choose how a Feature View is materialized from its measured read/write ratio.
+    - VIEW          : reads are rarer than writes, so recomputing on read is cheaper than refreshing
+    - DYNAMIC_TABLE : reads dominate and writes are infrequent, so a full refresh per write suffices
+    - INCREMENTAL   : reads dominate and writes are frequent, so refreshes only process changed rows
+    The dynamic table lag tracks the write interval, bounded to [min_lag_minutes, max_lag_minutes].
+    reads_per_hour              : Measured Feature View reads per hour
+    writes_per_hour             : Measured source-table writes per hour
+    view_read_seconds           : Measured latency of a read that recomputes the view
+    table_read_seconds          : Measured (or estimated) latency of a read from the materialized table
+    min_read_write_ratio        : Reads per write above which the view is materialized
+    incremental_writes_per_hour : Writes per hour at or above which incremental refresh is used
+    min_lag_minutes             : Lower bound of the dynamic table lag
+    max_lag_minutes             : Upper bound of the dynamic table lag
+
+    Returns                     : Dict with MODE, REFRESH_FREQ, READ_WRITE_RATIO and READ_SECONDS_SAVED_PER_HOUR
+    """
+    if writes_per_hour > 0:
+        ratio = reads_per_hour / writes_per_hour
+    else:
+        ratio = float("inf") if reads_per_hour > 0 else 0.0
+
+    if reads_per_hour == 0 or ratio < min_read_write_ratio:
+        return {
+            "MODE": VIEW,
+            "REFRESH_FREQ": None,
+            "READ_WRITE_RATIO": ratio,
+            "READ_SECONDS_SAVED_PER_HOUR": 0.0,
+        }
+
+    if writes_per_hour > 0:
+        lag_minutes = int(60 / writes_per_hour)
+    else:
+        lag_minutes = max_lag_minutes
+    lag_minutes = min(max(lag_minutes, min_lag_minutes), max_lag_minutes)
+
+    if writes_per_hour >= incremental_writes_per_hour:
+        mode = INCREMENTAL
+    else:
+        mode = DYNAMIC_TABLE
+
+    return {
+        "MODE": mode,
+        "REFRESH_FREQ": f"{lag_minutes} minute",
+        "READ_WRITE_RATIO": ratio,
+        "READ_SECONDS_SAVED_PER_HOUR": max(
+            reads_per_hour * (view_read_seconds - table_read_seconds), 0.0
+        ),
+    }
+
+
+def measure_materialization(
+    session, fs, fv, database, schema, source_tables, lookback_hours=24, **policy_args
+):
+    """
+    Measure a Feature View's workload and read latencies, and choose its materialization.
+    The timing reads are tagged so they do not count towards the next measurement's read rate.
+    session        : Snowpark session
+    fs             : Feature Store reference
+    fv             : Feature View to measure
+    database       : Database of the source tables
+    schema         : Schema of the source tables
+    source_tables  : Names of the tables the Feature View aggregates
+    lookback_hours : Hours of query history used for the read/write rates
+    policy_args    : Optional thresholds passed on to choose_materialization
+
+    Returns        : Policy dict returned by choose_materialization
+    """
+    reads_per_hour, writes_per_hour = measure_read_write_rates(
+        session, str(fv.name), database, schema, source_tables, lookback_hours
+    )
+    with measurement_query_tag(session):
+        view_read_seconds = time_feature_view_read(fs, fv)
+        table_read_seconds = time_materialized_read(fs, fv)
+    return choose_materialization(
+        reads_per_hour,
+        writes_per_hour,
+        view_read_seconds,
+        table_read_seconds,
+        **policy_args,
+    )
+
+
+def lag_seconds(lag):
+    """
+    Parse a dynamic table lag such as "15 minute" or Snowflake's normalised "15 minutes" into seconds.
+    lag     : Lag as given to, or returned from, a Feature View refresh_freq
+
+    Returns : Lag in seconds, or None if the lag is not a fixed duration (e.g. DOWNSTREAM)
+    """
+    match = _LAG_PATTERN.match(str(lag))
+    if match is None:
+        return None
+    return int(match.group("num")) * _LAG_UNIT_SECONDS[match.group("unit").lower()]
+
+
+def needs_rematerialization(fv, policy, supports_refresh_mode=True):
+    """
+    Check whether a registered Feature View is materialized differently from a policy.
+    Where FeatureView does not accept refresh_mode the registered view uses AUTO refresh,
+    which Snowflake reports resolved, so the refresh mode is not compared.
+    fv                    : Registered Feature View
+    policy                : Policy dict returned by choose_materialization
+    supports_refresh_mode : Whether the installed FeatureView accepts a refresh_mode argument
+
+    Returns               : TRUE if the Feature View should be re-registered under the policy
+    """
+    current_freq = getattr(fv, "refresh_freq", None)
+    if policy["MODE"] == VIEW:
+        return current_freq is not None
+    if current_freq is None:
+        return True
+    current_lag = lag_seconds(current_freq)
+    if current_lag is None or current_lag != lag_seconds(policy["REFRESH_FREQ"]):
+        return True
+    if not supports_refresh_mode:
+        return False
+    current_mode = getattr(fv, "refresh_mode", None)
+    if current_mode is None:
+        return False
+    expected_mode = "INCREMENTAL" if policy["MODE"] == INCREMENTAL else "FULL"
+    return str(current_mode).upper() != expected_mode
+
+
+def feature_view_kwargs(policy, supports_refresh_mode=True):
+    """
+    Translate a materialization policy into FeatureView constructor arguments.
+    A refresh_freq creates the FeatureView as a Dynamic Table, else it is created as a View.
+    Where FeatureView does not accept refresh_mode the Dynamic Table uses AUTO refresh,
+    which Snowflake runs incrementally whenever the query supports it.
+    policy                : Policy dict returned by choose_materialization
+    supports_refresh_mode : Whether the installed FeatureView accepts a refresh_mode argument
+
+    Returns               : Dict of keyword arguments to pass to FeatureView
+    """
+    if policy["MODE"] == VIEW:
+        return {}
+    kwargs = {"refresh_freq": policy["REFRESH_FREQ"]}
+    if not supports_refresh_mode:
+        return kwargs
+    if policy["MODE"] == INCREMENTAL:
+        kwargs["refresh_mode"] = "INCREMENTAL"
+    else:
+        kwargs["refresh_mode"] = "FULL"
+    return kwargs
+
+
+def print_materialization(fv_name, policy):
+    """
+    Report the chosen materialization and the read latency it saves.
+    fv_name : Feature View name
+    policy  : Policy dict returned by choose_materialization
+    """
+    print(f"Feature View : {fv_name} materialization : {policy['MODE']}")
+    print(f"  Read/Write ratio            : {policy['READ_WRITE_RATIO']:.2f}")
+    print(f"  Refresh frequency           : {policy['REFRESH_FREQ']}")
+    print(
+        f"  Read seconds saved per hour : {policy['READ_SECONDS_SAVED_PER_HOUR']:.2f}"
+    )
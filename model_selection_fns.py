@@ -0,0 +1,183 @@
+# MODEL SELECTION FUNCTIONS
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans
+from sklearn.metrics import silhouette_score
+
+from snowflake.snowpark import DataFrame
+
+
+# Worker-local view onto the shared feature matrix and silhouette sample, set by _attach_shared_features
+_SHARED_FEATURES = None
+_SHARED_FEATURES_SHM = None
+_SAMPLE_INDICES = None
+
+
+def uc01_scale_features(features_pdf: pd.DataFrame, input_cols: list) -> np.ndarray:
+    """
+    Min-Max scale the given feature columns locally, mirroring the clipped MinMaxScaler step in uc01_train.
+    features_pdf : Pandas dataframe containing the input feature columns
+    input_cols   : Columns to scale, in model input order
+
+    Returns      : Scaled feature matrix as a contiguous float64 array
+    """
+    x = features_pdf[input_cols].to_numpy(dtype=np.float64)
+    x_min = np.nanmin(x, axis=0)
+    x_range = np.nanmax(x, axis=0) - x_min
+    x_range[x_range == 0] = 1.0
+    x = np.clip((x - x_min) / x_range, 0.0, 1.0)
+    return np.ascontiguousarray(np.nan_to_num(x))
+
+
+def _attach_shared_features(shm_name, shape, dtype, sample_indices):
+    """
+    Process-pool initializer that attaches each worker to the shared feature matrix without copying it.
+    shm_name       : Name of the shared memory block holding the scaled features
+    shape          : Shape of the feature matrix
+    dtype          : Numpy dtype string of the feature matrix
+    sample_indices : Row indices of the silhouette sample shared by every candidate
+    """
+    global _SHARED_FEATURES, _SHARED_FEATURES_SHM, _SAMPLE_INDICES
+    _SAMPLE_INDICES = sample_indices
+    _SHARED_FEATURES_SHM = shared_memory.SharedMemory(name=shm_name)
+    _SHARED_FEATURES = np.ndarray(shape, dtype=dtype, buffer=_SHARED_FEATURES_SHM.buf)
+
+
+def _score_candidate(candidate):
+    """
+    Fit a single KMeans candidate against the shared feature matrix and score it.
+    candidate : Tuple of (num_clusters, random_state)
+
+    Returns   : Dict with the candidate parameters, INERTIA and SAMPLE SILHOUETTE score
+    """
+    num_clusters, random_state = candidate
+    x = _SHARED_FEATURES
+
+    km = KMeans(
+        n_clusters=num_clusters,
+        init="k-means++",
+        max_iter=300,
+        n_init=1,
+        random_state=random_state,
+    ).fit(x)
+
+    # Silhouette is quadratic in rows, so score every candidate on the same fixed-size sample
+    idx = _SAMPLE_INDICES
+    sample_labels = km.predict(x[idx])
+    if len(np.unique(sample_labels)) > 1:
+        silhouette = float(silhouette_score(x[idx], sample_labels))
+    else:
+        silhouette = float("nan")
+
+    return {
+        "NUM_CLUSTERS": num_clusters,
+        "RANDOM_STATE": random_state,
+        "INERTIA": float(km.inertia_),
+        "SILHOUETTE": silhouette,
+    }
+
+
+def uc01_sweep(
+    featurevector: DataFrame,
+    cluster_grid,
+    seeds,
+    sample_size=10000,
+    max_workers=None,
+    sample_seed=0,
+):
+    """
+    Evaluate a grid of KMeans cluster-counts and seeds in parallel across a process pool.
+    The scaled feature matrix is placed in shared memory once and read in-place by every worker.
+    Each seed is a single k-means++ restart, so the seeds for a cluster-count replace KMeans n_init.
+    featurevector : Snowpark dataframe containing O_CUSTOMER_SK, RETURN_RATIO and FREQUENCY
+    cluster_grid  : Candidate cluster-counts to evaluate
+    seeds         : Candidate random_state values to evaluate per cluster-count
+    sample_size   : Number of rows in the silhouette sample shared by every candidate
+    max_workers   : Process pool size.  If none, defaults to the number of CPUs
+    sample_seed   : Random seed used to draw the silhouette sample
+
+    Returns       : [best candidate as dict, dataframe of all candidate scores]
+    """
+    input_cols = ["RETURN_RATIO", "FREQUENCY"]
+    # Sort by the entity key so the local fit sees the same row order as the refit in uc01_train
+    x = uc01_scale_features(
+        featurevector.select(["O_CUSTOMER_SK"] + input_cols)
+        .sort("O_CUSTOMER_SK")
+        .to_pandas(),
+        input_cols,
+    )
+
+    candidates = [
+        (int(k), int(seed))
+        for k, seed in product(cluster_grid, seeds)
+        if 1 < int(k) <= x.shape[0]
+    ]
+    if not candidates:
+        raise ValueError(f"No valid cluster-counts in {list(cluster_grid)}")
+
+    sample_indices = np.sort(
+        np.random.default_rng(sample_seed).choice(
+            x.shape[0], size=min(int(sample_size), x.shape[0]), replace=False
+        )
+    )
+
+    shm = shared_memory.SharedMemory(create=True, size=x.nbytes)
+    try:
+        np.ndarray(x.shape, dtype=x.dtype, buffer=shm.buf)[:] = x
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_attach_shared_features,
+            initargs=(shm.name, x.shape, x.dtype.str, sample_indices),
+        ) as executor:
+            results = list(executor.map(_score_candidate, candidates))
+    finally:
+        shm.close()
+        shm.unlink()
+
+    scores_df = pd.DataFrame(results)
+
+    # Best restart per cluster-count is the lowest inertia (as KMeans n_init does),
+    # then pick the cluster-count whose best restart has the highest silhouette
+    best_per_k = scores_df.loc[scores_df.groupby("NUM_CLUSTERS")["INERTIA"].idxmin()]
+    best = best_per_k.sort_values(
+        ["SILHOUETTE", "NUM_CLUSTERS"], ascending=[False, True], na_position="last"
+    ).iloc[0]
+
+    print(scores_df.sort_values(["NUM_CLUSTERS", "RANDOM_STATE"]).to_string(index=False))
+    print(
+        f"Best candidate : NUM_CLUSTERS={int(best['NUM_CLUSTERS'])}, RANDOM_STATE={int(best['RANDOM_STATE'])}, SILHOUETTE={best['SILHOUETTE']:.4f}"
+    )
+
+    return [
+        {
+            "NUM_CLUSTERS": int(best["NUM_CLUSTERS"]),
+            "RANDOM_STATE": int(best["RANDOM_STATE"]),
+            "INERTIA": float(best["INERTIA"]),
+            "SILHOUETTE": float(best["SILHOUETTE"]),
+        },
+        scores_df,
+    ]
+
+
+def check_refit_inertia(model, best_candidate, rtol=0.01):
+    """
+    Check that the refit winning model is no worse than the candidate the sweep scored.
+    The refit runs in Snowflake ML rather than locally, so it is compared on inertia rather than centroids.
+    model          : Fitted Snowflake ML pipeline whose final step is KMeans
+    best_candidate : Best candidate dict returned by uc01_sweep
+    rtol           : Relative tolerance on inertia before the refit is reported as worse
+
+    Returns        : TRUE if the refit inertia is within tolerance of the scored candidate
+    """
+    refit_inertia = float(model.to_sklearn().steps[-1][1].inertia_)
+    within_tolerance = refit_inertia <= best_candidate["INERTIA"] * (1 + rtol)
+    print(
+        f"Refit inertia : {refit_inertia:.4f} (sweep candidate {best_candidate['INERTIA']:.4f})"
+        + ("" if within_tolerance else " - WARNING: refit is worse than the scored candidate")
+    )
+    return within_tolerance
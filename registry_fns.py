@@ -0,0 +1,175 @@
+# MODEL REGISTRY METADATA FUNCTIONS
+
+import json
+import re
+import time
+
+
+_VERSION_PATTERN = re.compile(r"^(?P<prefix>.*?)_?(?P<num>\d+)$")
+
+
+def version_sort_key(version_name):
+    """
+    Sort key giving numeric ordering of version names, so that V_10 sorts after V_9.
+    version_name : Model version name such as V_1
+
+    Returns      : Tuple usable as a sort key.  Names without a numeric suffix sort first
+    """
+    match = _VERSION_PATTERN.match(str(version_name))
+    if match is None:
+        return (0, str(version_name), -1)
+    return (1, match.group("prefix"), int(match.group("num")))
+
+
+def parse_versions(versions):
+    """
+    Parse the versions column returned by show_models into a numerically ordered list.
+    versions : JSON array string (as returned by show_models) or list of version names
+
+    Returns  : List of version names in ascending version order
+    """
+    if versions is None:
+        return []
+    if isinstance(versions, str):
+        versions = json.loads(versions) if versions.strip() else []
+    return sorted((str(v) for v in versions), key=version_sort_key)
+
+
+def next_version_name(versions, prefix="V"):
+    """
+    Get the next version name after the highest existing version.
+    versions : Version names already registered for a model
+    prefix   : Prefix used when the model has no versions yet
+
+    Returns  : Next version name, e.g. V_3 after [V_1, V_2]
+    """
+    versions = parse_versions(versions)
+    if not versions:
+        return f"{prefix}_1"
+    match = _VERSION_PATTERN.match(versions[-1])
+    if match is None:
+        return f"{prefix}_1"
+    return f"{match.group('prefix') or prefix}_{int(match.group('num')) + 1}"
+
+
+class RegistryIndex:
+    """
+    Cached index of Model Registry metadata keyed by model name.
+    Model and version listings are fetched with a single show_models call and reused until the TTL expires.
+    registry    : Model Registry, or any stand-in exposing show_models() returning a pandas dataframe
+                  with "name", "versions" and optionally "default_version_name" columns
+    ttl_seconds : Seconds before cached listings are re-fetched.  If none, listings never expire
+    clock       : Monotonic clock used for TTL checks
+    """
+
+    def __init__(self, registry, ttl_seconds=300, clock=time.monotonic):
+        self.registry = registry
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._models = None
+        self._fetched_at = None
+
+    def invalidate(self):
+        """
+        Drop the cached listings so the next lookup re-fetches them from the registry.
+        """
+        self._models = None
+        self._fetched_at = None
+
+    def refresh(self):
+        """
+        Fetch model and version listings from the registry and rebuild the index.
+        """
+        models_df = self.registry.show_models()
+        models = {}
+        if not models_df.empty:
+            has_default = "default_version_name" in models_df.columns
+            for _, row in models_df.iterrows():
+                models[row["name"]] = {
+                    "versions": parse_versions(row["versions"]),
+                    "default_version": row["default_version_name"] if has_default else None,
+                }
+        self._models = models
+        self._fetched_at = self.clock()
+        return models
+
+    def _is_stale(self):
+        if self._models is None:
+            return True
+        if self.ttl_seconds is None:
+            return False
+        return self.clock() - self._fetched_at >= self.ttl_seconds
+
+    @property
+    def models(self):
+        """
+        Index of model name to its versions and default version, re-fetched when stale.
+        """
+        if self._is_stale():
+            self.refresh()
+        return self._models
+
+    def versions(self, model_name):
+        """
+        Get the version names of a model in ascending version order.
+        model_name : Model name to look up
+        """
+        return list(self.models.get(model_name, {}).get("versions", []))
+
+    def latest_version(self, model_name):
+        """
+        Get the highest version name of a model, or None if the model is not registered.
+        model_name : Model name to look up
+        """
+        versions = self.versions(model_name)
+        return versions[-1] if versions else None
+
+    def default_version(self, model_name):
+        """
+        Get the default version name of a model, or None if the model is not registered.
+        model_name : Model name to look up
+        """
+        return self.models.get(model_name, {}).get("default_version")
+
+    def next_version(self, model_name):
+        """
+        Get the next version name to register for a model.
+        model_name : Model name to acquire next version for
+        """
+        return next_version_name(self.versions(model_name))
+
+    def record_version(self, model_name, version_name, default=False):
+        """
+        Add a newly logged version to the cached index without another registry round-trip.
+        model_name   : Model name the version was logged under
+        version_name : Version name that was logged
+        default      : When TRUE also record the version as the model default
+        """
+        entry = self.models.setdefault(
+            model_name, {"versions": [], "default_version": None}
+        )
+        if version_name not in entry["versions"]:
+            entry["versions"] = parse_versions(entry["versions"] + [version_name])
+        if default or entry["default_version"] is None:
+            entry["default_version"] = version_name
+
+    def set_default_version(self, session, database, schema, model_name, version_name):
+        """
+        Make a newly logged version the model default, and record it in the cached index.
+        The first version of a model becomes its default on creation, so only later versions issue
+        a statement, and then a single ALTER MODEL rather than a model lookup followed by an update.
+        session      : Snowpark session
+        database     : Database of the Model Registry
+        schema       : Schema of the Model Registry
+        model_name   : Model name the version was logged under
+        version_name : Version name to make the default
+
+        Returns      : TRUE if an ALTER MODEL statement was issued
+        """
+        issued = self.default_version(model_name) is not None
+        if issued:
+            session.sql(
+                f"""alter model {database}.{schema}.{model_name} set default_version = {version_name}"""
+            ).collect()
+        self.record_version(model_name, version_name, default=True)
+        return issued
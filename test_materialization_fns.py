@@ -0,0 +1,142 @@
+from materialization_fns import (
+    DYNAMIC_TABLE,
+    INCREMENTAL,
+    VIEW,
+    choose_materialization,
+    feature_view_kwargs,
+    lag_seconds,
+    needs_rematerialization,
+    time_feature_view_read,
+    time_materialized_read,
+)
+
+
+class StandInDataFrame:
+    def __init__(self, reads, source="view"):
+        self.reads = reads
+        self.source = source
+        self.columns = ["O_CUSTOMER_SK", "RETURN_RATIO", "FREQUENCY"]
+
+    def count(self):
+        self.reads.append(("count", self.source))
+        return 0
+
+    def select(self, *cols):
+        self.reads.append(("select", self.source))
+        return self
+
+    def collect(self):
+        return []
+
+    def cache_result(self):
+        return StandInDataFrame(self.reads, "snapshot")
+
+
+class StandInFeatureStore:
+    """
+    In-memory stand-in for the Feature Store, recording reads of Feature Views.
+    """
+
+    def __init__(self):
+        self.reads = []
+
+    def read_feature_view(self, fv):
+        return StandInDataFrame(self.reads)
+
+
+class StandInFeatureView:
+    def __init__(self, refresh_freq=None, refresh_mode=None):
+        self.name = "FV_UC01_PREPROCESS"
+        self.refresh_freq = refresh_freq
+        self.refresh_mode = refresh_mode
+
+
+def test_rarely_read_view_stays_a_view():
+    policy = choose_materialization(2, 10, 5.0, 0.5)
+
+    assert policy["MODE"] == VIEW
+    assert policy["REFRESH_FREQ"] is None
+    assert policy["READ_SECONDS_SAVED_PER_HOUR"] == 0.0
+    assert feature_view_kwargs(policy) == {}
+
+
+def test_read_heavy_infrequent_writes_use_dynamic_table():
+    policy = choose_materialization(50, 4, 2.0, 0.1)
+
+    assert policy["MODE"] == DYNAMIC_TABLE
+    assert policy["REFRESH_FREQ"] == "15 minute"
+    assert policy["READ_SECONDS_SAVED_PER_HOUR"] == 50 * (2.0 - 0.1)
+    assert feature_view_kwargs(policy) == {
+        "refresh_freq": "15 minute",
+        "refresh_mode": "FULL",
+    }
+
+
+def test_read_heavy_frequent_writes_use_incremental_refresh():
+    policy = choose_materialization(600, 60, 2.0, 0.1)
+
+    assert policy["MODE"] == INCREMENTAL
+    assert policy["REFRESH_FREQ"] == "1 minute"
+    assert feature_view_kwargs(policy) == {
+        "refresh_freq": "1 minute",
+        "refresh_mode": "INCREMENTAL",
+    }
+
+
+def test_incremental_matches_dynamic_table_without_refresh_mode_support():
+    incremental = choose_materialization(600, 60, 2.0, 0.1)
+    dynamic_table = choose_materialization(60, 6, 2.0, 0.1, incremental_writes_per_hour=61)
+    dynamic_table["REFRESH_FREQ"] = incremental["REFRESH_FREQ"]
+
+    assert feature_view_kwargs(incremental, supports_refresh_mode=False) == {
+        "refresh_freq": "1 minute"
+    }
+    assert feature_view_kwargs(
+        incremental, supports_refresh_mode=False
+    ) == feature_view_kwargs(dynamic_table, supports_refresh_mode=False)
+
+
+def test_lag_is_bounded_when_there_are_no_writes():
+    policy = choose_materialization(10, 0, 2.0, 0.1, max_lag_minutes=120)
+
+    assert policy["MODE"] == DYNAMIC_TABLE
+    assert policy["REFRESH_FREQ"] == "120 minute"
+
+
+def test_read_timings_use_the_stand_in_feature_store():
+    fs = StandInFeatureStore()
+    fv = StandInFeatureView()
+
+    assert time_feature_view_read(fs, fv, repeats=3) >= 0.0
+    assert time_materialized_read(fs, fv, repeats=3) >= 0.0
+    # View and snapshot are timed with the same full scan, never a metadata-only count
+    assert fs.reads == [("select", "view")] * 3 + [("select", "snapshot")] * 3
+
+
+def test_needs_rematerialization_compares_registered_refresh():
+    view_policy = choose_materialization(2, 10, 5.0, 0.5)
+    table_policy = choose_materialization(50, 4, 2.0, 0.1)
+
+    assert not needs_rematerialization(StandInFeatureView(), view_policy)
+    assert needs_rematerialization(StandInFeatureView(), table_policy)
+    assert not needs_rematerialization(StandInFeatureView("15 minute"), table_policy)
+    assert needs_rematerialization(StandInFeatureView("15 minute"), view_policy)
+
+    assert not needs_rematerialization(StandInFeatureView("15 minutes"), table_policy)
+    assert needs_rematerialization(StandInFeatureView("1 hour"), table_policy)
+
+
+def test_lag_is_parsed_into_seconds():
+    assert lag_seconds("15 minute") == lag_seconds("15 minutes") == 900
+    assert lag_seconds("1 HOUR") == lag_seconds("60 minutes")
+    assert lag_seconds("DOWNSTREAM") is None
+
+
+def test_resolved_refresh_mode_ignored_without_refresh_mode_support():
+    incremental_policy = choose_materialization(600, 60, 2.0, 0.1)
+    registered = StandInFeatureView("1 minutes", refresh_mode="FULL")
+
+    assert needs_rematerialization(registered, incremental_policy)
+    assert not needs_rematerialization(
+        registered, incremental_policy, supports_refresh_mode=False
+    )
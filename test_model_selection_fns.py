@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from model_selection_fns import uc01_scale_features, uc01_sweep
+
+
+class StandInDataFrame:
+    """
+    In-memory stand-in for a Snowpark dataframe, supporting the calls uc01_sweep makes.
+    """
+
+    def __init__(self, pdf):
+        self.pdf = pdf
+
+    def select(self, cols):
+        return StandInDataFrame(self.pdf[cols])
+
+    def sort(self, col):
+        return StandInDataFrame(self.pdf.sort_values(col))
+
+    def to_pandas(self):
+        return self.pdf.reset_index(drop=True)
+
+
+def three_segment_features(rows_per_segment=200):
+    rng = np.random.default_rng(0)
+    centres = [(0.1, 1.0), (0.5, 5.0), (0.9, 9.0)]
+    pdf = pd.DataFrame(
+        {
+            "RETURN_RATIO": np.concatenate(
+                [rng.normal(c[0], 0.02, rows_per_segment) for c in centres]
+            ),
+            "FREQUENCY": np.concatenate(
+                [rng.normal(c[1], 0.2, rows_per_segment) for c in centres]
+            ),
+        }
+    )
+    # Shuffle customer keys so the sweep has to sort them
+    pdf["O_CUSTOMER_SK"] = rng.permutation(len(pdf))
+    return StandInDataFrame(pdf)
+
+
+def test_scale_features_clips_to_unit_range():
+    pdf = pd.DataFrame({"A": [1.0, 2.0, 3.0], "B": [5.0, 5.0, 5.0]})
+    x = uc01_scale_features(pdf, ["A", "B"])
+
+    assert x.tolist() == [[0.0, 0.0], [0.5, 0.0], [1.0, 0.0]]
+
+
+def test_sweep_picks_best_cluster_count_and_restart():
+    best, scores_df = uc01_sweep(
+        three_segment_features(), range(2, 6), range(3), sample_size=300, max_workers=2
+    )
+
+    assert len(scores_df) == 4 * 3
+    assert best["NUM_CLUSTERS"] == 3
+    best_k = scores_df[scores_df["NUM_CLUSTERS"] == 3]
+    assert best["INERTIA"] == best_k["INERTIA"].min()
+    assert best["SILHOUETTE"] == scores_df["SILHOUETTE"].max()
+
+
+def test_sweep_scores_every_candidate_on_the_same_sample():
+    _, scores_df = uc01_sweep(
+        three_segment_features(), [3], range(4), sample_size=100, max_workers=2
+    )
+
+    # Restarts converging to the same clustering get identical silhouettes on a shared sample
+    converged = scores_df[np.isclose(scores_df["INERTIA"], scores_df["INERTIA"].min())]
+    assert len(converged) > 1
+    assert converged["SILHOUETTE"].nunique() == 1
+
+
+def test_sweep_rejects_empty_grid():
+    with pytest.raises(ValueError):
+        uc01_sweep(three_segment_features(), [1], range(2))
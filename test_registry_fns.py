@@ -0,0 +1,115 @@
+import pandas as pd
+
+from registry_fns import RegistryIndex, next_version_name, parse_versions
+
+
+class StandInRegistry:
+    """
+    In-memory stand-in for the Model Registry, counting show_models round-trips.
+    """
+
+    def __init__(self, models):
+        self.models = models
+        self.calls = 0
+
+    def show_models(self):
+        self.calls += 1
+        return pd.DataFrame(
+            [
+                {
+                    "name": name,
+                    "versions": '["' + '","'.join(versions) + '"]',
+                    "default_version_name": versions[0],
+                }
+                for name, versions in self.models.items()
+            ],
+            columns=["name", "versions", "default_version_name"],
+        )
+
+
+class StandInSession:
+    """
+    Stand-in for a Snowpark session, recording the SQL statements issued.
+    """
+
+    def __init__(self):
+        self.statements = []
+
+    def sql(self, statement):
+        self.statements.append(statement)
+        return self
+
+    def collect(self):
+        return []
+
+
+class StandInClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_versions_are_ordered_numerically():
+    assert parse_versions('["V_9","V_10","V_2"]') == ["V_2", "V_9", "V_10"]
+    assert next_version_name('["V_9","V_10"]') == "V_11"
+    assert next_version_name([]) == "V_1"
+
+
+def test_lookup_is_by_model_name_not_first_row():
+    registry = StandInRegistry(
+        {"OTHER_MODEL": ["V_1", "V_2", "V_3"], "UC01_MODEL": ["V_9", "V_10"]}
+    )
+    index = RegistryIndex(registry)
+
+    assert index.latest_version("UC01_MODEL") == "V_10"
+    assert index.next_version("UC01_MODEL") == "V_11"
+    assert index.next_version("OTHER_MODEL") == "V_4"
+    assert index.next_version("NEW_MODEL") == "V_1"
+    assert registry.calls == 1
+
+
+def test_listings_refetched_after_ttl():
+    registry = StandInRegistry({"UC01_MODEL": ["V_1"]})
+    clock = StandInClock()
+    index = RegistryIndex(registry, ttl_seconds=60, clock=clock)
+
+    index.versions("UC01_MODEL")
+    clock.now = 59
+    registry.models["UC01_MODEL"] = ["V_1", "V_2"]
+    assert index.latest_version("UC01_MODEL") == "V_1"
+    assert registry.calls == 1
+
+    clock.now = 60
+    assert index.latest_version("UC01_MODEL") == "V_2"
+    assert registry.calls == 2
+
+
+def test_record_version_updates_index_without_refetch():
+    registry = StandInRegistry({"UC01_MODEL": ["V_9"]})
+    index = RegistryIndex(registry)
+
+    index.record_version("UC01_MODEL", index.next_version("UC01_MODEL"), default=True)
+    index.record_version("NEW_MODEL", "V_1")
+
+    assert index.versions("UC01_MODEL") == ["V_9", "V_10"]
+    assert index.default_version("UC01_MODEL") == "V_10"
+    assert index.default_version("NEW_MODEL") == "V_1"
+    assert registry.calls == 1
+
+
+def test_set_default_version_issues_single_alter_only_for_later_versions():
+    registry = StandInRegistry({"UC01_MODEL": ["V_1"]})
+    session = StandInSession()
+    index = RegistryIndex(registry)
+
+    assert index.set_default_version(session, "DB", "_MODEL_REGISTRY", "UC01_MODEL", "V_2")
+    assert not index.set_default_version(session, "DB", "_MODEL_REGISTRY", "NEW_MODEL", "V_1")
+
+    assert session.statements == [
+        "alter model DB._MODEL_REGISTRY.UC01_MODEL set default_version = V_2"
+    ]
+    assert index.default_version("UC01_MODEL") == "V_2"
+    assert index.default_version("NEW_MODEL") == "V_1"
+    assert registry.calls == 1
@@ -15,30 +15,6 @@ def run_sql(sql_statement, session):
     # print(result)
 
 
-import ast
-
-
-def check_and_update(df, model_name):
-    """
-    Check and update the version numbering scheme for Model Registry
-    to get the next version number for a model.
-    df         : dataframe from show_models
-    model_name : model-name to acquire next version for
-    """
-    if df.empty:
-        return "V_1"
-    elif df[df["name"] == model_name].empty:
-        return "V_1"
-    else:
-        # Increment model_version if df is not a pandas Series
-        lst = sorted(ast.literal_eval(df["versions"][0]))
-        last_value = lst[-1]
-        prefix, num = last_value.rsplit("_", 1)
-        new_last_value = f"{prefix}_{int(num)+1}"
-        lst[-1] = new_last_value
-        return new_last_value
-
-
 import sqlglot
 import sqlglot.optimizer.optimizer
 
@@ -56,58 +32,6 @@ def formatSQL(query_in: str, subq_to_cte=False):
     return sqlglot.transpile(query_in, read="snowflake", pretty=True)[0]
 
 
-from snowflake.ml.registry import Registry
-from snowflake.ml._internal.utils import identifier
-
-
-def create_ModelRegistry(session, database, mr_schema="_MODEL_REGISTRY"):
-    """
-    Create Snowflake Model Registry if not exists and return as reference.
-    session   : Snowpark session
-    database  : Database to use for Model Registry
-    mr_schema : Schema name to create/use for Model Registry
-    """
-
-    try:
-        cs = session.get_current_schema()
-        session.sql(f""" create schema {mr_schema} """).collect()
-        mr = Registry(session=session, database_name=database, schema_name=mr_schema)
-        session.sql(f""" use schema {cs}""").collect()
-    except:
-        print(f"Model Registry ({mr_schema}) already exists")
-        mr = Registry(session=session, database_name=database, schema_name=mr_schema)
-    else:
-        print(f"Model Registry ({mr_schema}) created")
-
-    return mr
-
-
-from snowflake.ml.feature_store import FeatureStore, CreationMode
-
-
-def create_FeatureStore(session, database, fs_schema, warehouse):
-    """
-    Create Snowflake Feature Store if not exists and return reference
-    session   : Snowpark session
-    database  : Database to use for Feature Store
-    fs_schema : Schema name to ceate/use to check for Feature Store
-    warehouse : Warehouse to use as default for Feature Store
-    """
-
-    try:
-        fs = FeatureStore(
-            session, database, fs_schema, warehouse, CreationMode.FAIL_IF_NOT_EXIST
-        )
-        print(f"Feature Store ({fs_schema}) already exists")
-    except:
-        print(f"Feature Store ({fs_schema}) created")
-        fs = FeatureStore(
-            session, database, fs_schema, warehouse, CreationMode.CREATE_IF_NOT_EXIST
-        )
-
-    return fs
-
-
 def init_snowflake(scale_factor, tpcxai_database, tpcxai_schema, fs_qs_role):
     # Create Snowflake Session object
     session = Session.builder.getOrCreate()